@@ -1,8 +1,11 @@
 import os
+import time
+import functools
 import uuid
+import asyncio
 import logging
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import AsyncIterator, Optional
 
 # ---- optional local .env loading (harmless on Render if not installed) ----
 try:
@@ -11,23 +14,45 @@ try:
 except Exception:
     pass
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from cachetools import TTLCache
+import msgspec
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import DuplicateKeyError  # motor raises PyMongo errors
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError  # motor raises PyMongo errors
 
 # ---------------------------------------------------------------------------
 
-logging.basicConfig(level=logging.INFO)
+# Set LOG_LEVEL=WARNING under heavy traffic to drop the per-request INFO lines
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger("smsdigi-api")
 
-app = FastAPI(title="SMS Marketing SaaS API")
+app = FastAPI(title="SMS Marketing SaaS API", default_response_class=ORJSONResponse)
 
 # ----- Config (env vars) ----------------------------------------------------
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/")
 DB_NAME = os.getenv("DB_NAME", "sms")  # set this in Render to your chosen DB
+# Inserts are coalesced: flush once BATCH_MAX docs are queued or FLUSH_MS passed
+BATCH_MAX = int(os.getenv("WRITE_BATCH_MAX", "200"))
+FLUSH_MS = int(os.getenv("WRITE_FLUSH_MS", "5"))
+# A POST gives up (500) if its batch has not been written within this many seconds
+WRITE_TIMEOUT = float(os.getenv("WRITE_TIMEOUT", "10"))
+MONGO_MIN_POOL = int(os.getenv("MONGO_MIN_POOL", "5"))
+MONGO_MAX_POOL = int(os.getenv("MONGO_MAX_POOL", "50"))
+# zstd needs the `zstandard` package; snappy can be added if python-snappy is installed
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,zlib")
+# Max documents per collection returned by /api/admin/overview (newest first)
+OVERVIEW_LIMIT = int(os.getenv("OVERVIEW_LIMIT", "500"))
+# List pages are read from Mongo STREAM_BATCH docs per getMore and flushed to
+# the client roughly every STREAM_CHUNK_BYTES
+STREAM_BATCH = int(os.getenv("STREAM_BATCH", "500"))
+STREAM_CHUNK_BYTES = 64 * 1024
+# List pages are cached per worker for this many seconds (cleared on writes)
+LIST_CACHE_TTL = float(os.getenv("LIST_CACHE_TTL", "5"))
+# ...and each list cache holds at most this many bytes of encoded pages
+LIST_CACHE_MAX_BYTES = int(os.getenv("LIST_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
 # Comma-separated list, e.g. "https://smsdigi.com,https://www.smsdigi.com"
 CORS_ORIGINS_ENV = os.getenv("CORS_ORIGINS", "")
 
@@ -46,69 +71,417 @@ app.add_middleware(
     allow_origins=ALLOW_ORIGINS,
     allow_origin_regex=r"^https://.*\.vercel\.app$",
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Only what the API serves; explicit lists avoid echoing request headers
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # ----- DB -------------------------------------------------------------------
-client = AsyncIOMotorClient(MONGO_URL)
+client = AsyncIOMotorClient(
+    MONGO_URL,
+    minPoolSize=MONGO_MIN_POOL,
+    maxPoolSize=MONGO_MAX_POOL,
+    compressors=MONGO_COMPRESSORS,
+    zlibCompressionLevel=3,
+    serverSelectionTimeoutMS=3000,
+    connectTimeoutMS=2000,
+    retryWrites=True,
+    tz_aware=True,  # created_at comes back as an aware UTC datetime
+)
 db = client[DB_NAME]
 
+# ----- IDs ------------------------------------------------------------------
+class UuidPool:
+    """Hand out random UUID4 strings from one batched os.urandom() read."""
+
+    __slots__ = ("buf", "i")
+    SIZE = 16 * 1024  # 1024 UUIDs per syscall
+
+    def __init__(self) -> None:
+        self.refill()
+
+    def refill(self) -> None:
+        self.buf = os.urandom(self.SIZE)
+        self.i = 0
+
+    def next(self) -> str:
+        if self.i >= self.SIZE:
+            self.refill()
+        b = self.buf[self.i:self.i + 16]
+        self.i += 16
+        return str(uuid.UUID(bytes=b, version=4))
+
+UUIDS = UuidPool()
+# Forked workers must not hand out the same buffered bytes as their parent
+os.register_at_fork(after_in_child=UUIDS.refill)
+
 # ----- Models ---------------------------------------------------------------
-class ContactForm(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class Document(BaseModel):
+    # Ignore stray keys rather than rejecting them; no assignment validation
+    model_config = ConfigDict(
+        extra="ignore",
+        str_strip_whitespace=True,
+        validate_assignment=False,
+        arbitrary_types_allowed=False,
+    )
+
+class ContactForm(Document):
+    id: str = Field(default_factory=UUIDS.next)
+    name: str
+    email: str
+    company: Optional[str] = None
+    phone: Optional[str] = None
+    message: Optional[str] = None
+    plan_interest: Optional[str] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class Newsletter(Document):
+    id: str = Field(default_factory=UUIDS.next)
+    email: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# Egress shapes for list reads: DB documents were validated on the way in, so
+# msgspec only has to map them onto these structs and encode them.
+class ContactOut(msgspec.Struct, kw_only=True):
+    id: str
     name: str
     email: str
     company: Optional[str] = None
     phone: Optional[str] = None
     message: Optional[str] = None
     plan_interest: Optional[str] = None
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: datetime
 
-class Newsletter(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+class NewsletterOut(msgspec.Struct, kw_only=True):
+    id: str
     email: str
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: datetime
+
+JSON_ENCODER = msgspec.json.Encoder()
 
 # ----- Helpers --------------------------------------------------------------
-def strip_mongo_id(doc: dict) -> dict:
-    """Remove internal _id so Pydantic models accept the dict."""
-    if not doc:
-        return doc
-    doc = dict(doc)
-    doc.pop("_id", None)
-    return doc
+# Exclude Mongo's internal _id server-side so it never crosses the wire.
+NO_MONGO_ID = {"_id": 0}
+
+# Keyset pagination: the cursor handed back to clients is "<created_at>|<id>" of
+# the last item on the page, so ties on created_at are broken by id.
+PAGE_SORT = [("created_at", 1), ("id", 1)]
+# The overview shows the most recent rows; same index, scanned backwards
+NEWEST_FIRST = [("created_at", -1), ("id", -1)]
+
+def page_filter(after: Optional[str]) -> dict:
+    """Build the Mongo filter selecting documents strictly after a page cursor.
+
+    Raises ValueError if the cursor's timestamp is not ISO 8601.
+    """
+    if not after:
+        return {}
+    created_at, sep, last_id = after.partition("|")
+    created_at = datetime.fromisoformat(created_at)
+    if not sep:
+        return {"created_at": {"$gt": created_at}}
+    return {
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"created_at": created_at, "id": {"$gt": last_id}},
+        ]
+    }
+
+class PageCache:
+    """Read-through cache of encoded list pages, keyed by (limit, after).
+
+    Each worker has its own; a write invalidates the local one and the TTL
+    bounds the rest. Reads that began before the last invalidation are not
+    stored, so a slow GET cannot put a pre-write page back.
+    """
+
+    def __init__(self) -> None:
+        # Sized by body length: keys are client-controlled and pages can be large
+        self.pages: TTLCache = TTLCache(maxsize=LIST_CACHE_MAX_BYTES, ttl=LIST_CACHE_TTL, getsizeof=len)
+        self.generation = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        return self.pages.get(key)
+
+    def store(self, key: tuple, generation: int, page: bytes) -> None:
+        if generation == self.generation and len(page) <= self.pages.maxsize:
+            self.pages[key] = page
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self.pages.clear()
+
+contacts_cache = PageCache()
+subscribers_cache = PageCache()
+
+async def fetch_page(collection, out_type, cache: PageCache, limit: int, after: Optional[str]) -> Response:
+    """Return one bounded page, streamed from the cursor unless already cached."""
+    key = (limit, after)
+    page = cache.get(key)
+    if page is not None:
+        return Response(page, media_type="application/json")
+    generation = cache.generation
+    cursor = (
+        collection.find(page_filter(after), projection=NO_MONGO_ID)
+        .sort(PAGE_SORT)
+        .limit(limit)
+        .batch_size(min(limit, STREAM_BATCH))
+    )
+    # Pull the first document before streaming so query errors still become a 500
+    try:
+        first = await cursor.next()
+    except StopAsyncIteration:
+        first = None
+    return StreamingResponse(
+        stream_page(cursor, first, out_type, limit, cache, key, generation),
+        media_type="application/json",
+    )
+
+async def stream_page(
+    cursor, first, out_type, limit: int, cache: PageCache, key: tuple, generation: int
+) -> AsyncIterator[bytes]:
+    """Yield the page envelope in chunks while the cursor is still being read.
+
+    The chunks are also kept so the finished body can be cached; pages are
+    capped at 1000 items, so this stays bounded.
+    """
+    parts = []
+    buf = bytearray(b'{"items":[')
+    last = None
+    count = 0
+    doc = first
+    try:
+        while doc is not None:
+            if count:
+                buf += b","
+            last = msgspec.convert(doc, out_type)
+            JSON_ENCODER.encode_into(last, buf, -1)
+            count += 1
+            if len(buf) >= STREAM_CHUNK_BYTES:
+                parts.append(bytes(buf))
+                buf.clear()
+                yield parts[-1]
+            try:
+                doc = await cursor.next()
+            except StopAsyncIteration:
+                doc = None
+    except Exception as e:
+        # Headers are already sent; re-raise so the server aborts the connection
+        # instead of ending a 200 with an empty or truncated body
+        logger.exception(f"Error streaming page: {e}")
+        raise
+    finally:
+        # Also runs on client disconnect (GeneratorExit) so the server cursor is freed
+        await cursor.close()
+
+    next_cursor = None
+    if count == limit:
+        # "Z" rather than "+00:00" so the cursor survives unencoded in a query string
+        created_at = last.created_at.isoformat().replace("+00:00", "Z")
+        next_cursor = f"{created_at}|{last.id}"
+    buf += b'],"next":'
+    JSON_ENCODER.encode_into(next_cursor, buf, -1)
+    buf += b"}"
+    parts.append(bytes(buf))
+    yield parts[-1]
+    cache.store(key, generation, b"".join(parts))
+
+class BatchWriter:
+    """Coalesce per-request inserts into one insert_many round trip."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        # Created in start() so they belong to the event loop that runs them
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.batch: list = []  # batch the loop is currently holding
+
+    def start(self) -> None:
+        if self.task is None or self.task.done():
+            self.queue = asyncio.Queue()
+            self.batch = []
+            self.task = asyncio.create_task(self.flush_loop(self.queue))
+            self.task.add_done_callback(functools.partial(self.fail_pending, self.queue))
+
+    async def insert(self, doc: dict) -> None:
+        """Queue a document and wait until its batch has been written.
+
+        Raises DuplicateKeyError for unique-index violations, like insert_one,
+        and asyncio.TimeoutError if the document is still queued after
+        WRITE_TIMEOUT seconds. Once its batch is being written, the outcome is
+        awaited instead so a write that lands is never reported as failed.
+        """
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((doc, fut))
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), WRITE_TIMEOUT)
+        except asyncio.TimeoutError:
+            if any(f is fut for _, f in self.batch):
+                await fut
+                return
+            fut.cancel()  # still queued: flush() drops cancelled items
+            raise
+
+    async def close(self) -> None:
+        """Write everything queued so far, then stop the background task."""
+        if self.task is None:
+            return
+        if not self.task.done():
+            await self.queue.put(None)  # sentinel: the loop exits once it gets here
+            await self.task
+        self.task = None
+
+    def fail_pending(self, queue: asyncio.Queue, task: asyncio.Task) -> None:
+        """Fail every write the loop was holding or had not reached when it exited."""
+        if task.cancelled():
+            exc: BaseException = RuntimeError("write batcher was cancelled")
+        elif task.exception() is not None:
+            exc = task.exception()
+            logger.error(f"Write batcher stopped: {exc!r}")
+        else:
+            exc = RuntimeError("write batcher stopped")
+        pending = self.batch
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        for item in pending:
+            if item is None:
+                continue
+            _, fut = item
+            if not fut.done():
+                try:
+                    fut.set_exception(exc)
+                except RuntimeError:  # future's event loop is already closed
+                    pass
+
+    async def flush_loop(self, queue: asyncio.Queue) -> None:
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                break
+            self.batch = batch = [item]
+            # Give concurrent requests a moment to join this batch
+            if queue.qsize() < BATCH_MAX - 1:
+                await asyncio.sleep(FLUSH_MS / 1000)
+            while len(batch) < BATCH_MAX and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self.flush(batch)
+            self.batch = []
+
+    async def flush(self, batch: list) -> None:
+        batch = [item for item in batch if not item[1].done()]  # timed out while queued
+        if not batch:
+            return
+        errors = {}
+        try:
+            await self.collection.insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for i, (_, fut) in enumerate(batch):
+            if fut.done():  # already settled elsewhere
+                continue
+            err = errors.get(i)
+            if err is None:
+                fut.set_result(None)
+            elif err.get("code") == 11000:
+                fut.set_exception(DuplicateKeyError(err.get("errmsg", "duplicate key"), 11000, err))
+            else:
+                fut.set_exception(WriteError(err.get("errmsg", "write failed"), err.get("code"), err))
+
+contacts_writer = BatchWriter(db.contacts)
+newsletter_writer = BatchWriter(db.newsletter)
 
 # Ensure indexes (runs once on startup)
 @app.on_event("startup")
 async def ensure_indexes() -> None:
     try:
         await db.command("ping")
+        # open the rest of the minimum pool now rather than on first requests
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(MONGO_MIN_POOL)))
         # unique email for newsletter
         await db.newsletter.create_index("email", unique=True)
+        # keyset pagination sort for the list endpoints (the planner picks it for PAGE_SORT)
+        await db.newsletter.create_index(PAGE_SORT)
+        await db.contacts.create_index(PAGE_SORT)
+        # contact lookup by email
+        await db.contacts.create_index("email")
         logger.info("Startup: DB connected and indexes ensured.")
     except Exception as e:
         logger.exception(f"Startup checks failed: {e}")
 
+# Convert documents written when created_at was an ISO string (runs once on
+# startup; the (created_at, id) index keeps it a cheap no-op once migrated)
+@app.on_event("startup")
+async def migrate_created_at() -> None:
+    for coll in (db.contacts, db.newsletter):
+        try:
+            result = await coll.update_many(
+                {"created_at": {"$type": "string"}},
+                [{"$set": {"created_at": {"$toDate": "$created_at"}}}],
+            )
+            if result.modified_count:
+                logger.info("Startup: converted created_at to a date on %d %s documents",
+                            result.modified_count, coll.name)
+        except Exception as e:
+            logger.exception(f"Startup created_at migration failed for {coll.name}: {e}")
+
+@app.on_event("startup")
+async def start_writers() -> None:
+    contacts_writer.start()
+    newsletter_writer.start()
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    # Drain queued writes so no in-flight POST is lost, then release sockets
+    await asyncio.gather(contacts_writer.close(), newsletter_writer.close())
+    client.close()
+
 # ----- Routes ---------------------------------------------------------------
+# Constant bodies are serialized once at import. A fresh Response is still built
+# per request because middleware (CORS) mutates the headers of the one it sends.
+ROOT_BODY = JSON_ENCODER.encode({"message": "SMS Marketing SaaS API is running"})
+HEALTHY_BODY = JSON_ENCODER.encode({"status": "healthy", "database": "connected"})
+
+# Liveness probes reuse the last DB ping result for this long (seconds)
+HEALTH_TTL = 1.0
+health_state = {"checked_at": float("-inf"), "ok": False}
+
 @app.get("/")
 async def root():
-    return {"message": "SMS Marketing SaaS API is running"}
+    return Response(ROOT_BODY, media_type="application/json")
 
 @app.get("/api/health")
 async def health_check():
-    try:
-        await db.command("ping")
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
+    if time.monotonic() - health_state["checked_at"] >= HEALTH_TTL:
+        try:
+            await db.command("ping")
+            health_state["ok"] = True
+        except Exception as e:
+            logger.error(f"Health check failed: {e}")
+            health_state["ok"] = False
+        health_state["checked_at"] = time.monotonic()
+    if not health_state["ok"]:
         raise HTTPException(status_code=503, detail="Service unavailable")
+    return Response(HEALTHY_BODY, media_type="application/json")
 
 @app.post("/api/contact", response_model=ContactForm)
 async def submit_contact_form(contact: ContactForm):
     try:
-        await db.contacts.insert_one(contact.model_dump())
-        logger.info(f"New contact form submitted: {contact.email}")
+        # Validated fields live in __dict__; copy it because the driver adds _id
+        await contacts_writer.insert(contact.__dict__.copy())
+        contacts_cache.invalidate()
+        logger.info("New contact form submitted: %s", contact.email)
         return contact
     except Exception as e:
         logger.exception(f"Error submitting contact form: {e}")
@@ -118,8 +491,9 @@ async def submit_contact_form(contact: ContactForm):
 async def subscribe_newsletter(newsletter: Newsletter):
     try:
         # Rely on unique index; catch duplicates cleanly
-        await db.newsletter.insert_one(newsletter.model_dump())
-        logger.info(f"New newsletter subscription: {newsletter.email}")
+        await newsletter_writer.insert(newsletter.__dict__.copy())
+        subscribers_cache.invalidate()
+        logger.info("New newsletter subscription: %s", newsletter.email)
         return newsletter
     except DuplicateKeyError:
         raise HTTPException(status_code=400, detail="Email already subscribed")
@@ -127,25 +501,55 @@ async def subscribe_newsletter(newsletter: Newsletter):
         logger.exception(f"Error subscribing to newsletter: {e}")
         raise HTTPException(status_code=500, detail="Failed to subscribe to newsletter")
 
-@app.get("/api/contacts", response_model=List[ContactForm])
-async def get_contacts():
+@app.get("/api/contacts")
+async def get_contacts(limit: int = Query(100, ge=1, le=1000), after: Optional[str] = None):
     try:
-        contacts = await db.contacts.find().to_list(length=None)
-        return [ContactForm(**strip_mongo_id(c)) for c in contacts]
+        # Returning the response directly skips FastAPI's jsonable_encoder walk
+        return await fetch_page(db.contacts, ContactOut, contacts_cache, limit, after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
     except Exception as e:
         logger.exception(f"Error fetching contacts: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch contacts")
 
-@app.get("/api/subscribers", response_model=List[Newsletter])
-async def get_subscribers():
+@app.get("/api/subscribers")
+async def get_subscribers(limit: int = Query(100, ge=1, le=1000), after: Optional[str] = None):
     try:
-        subscribers = await db.newsletter.find().to_list(length=None)
-        return [Newsletter(**strip_mongo_id(s)) for s in subscribers]
+        return await fetch_page(db.newsletter, NewsletterOut, subscribers_cache, limit, after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
     except Exception as e:
         logger.exception(f"Error fetching subscribers: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch subscribers")
 
+@app.get("/api/admin/overview")
+async def get_overview():
+    try:
+        # Both reads go out on separate pool connections and overlap
+        contacts, subscribers = await asyncio.gather(
+            db.contacts.find({}, NO_MONGO_ID).sort(NEWEST_FIRST).to_list(OVERVIEW_LIMIT),
+            db.newsletter.find({}, NO_MONGO_ID).sort(NEWEST_FIRST).to_list(OVERVIEW_LIMIT),
+        )
+        # Same structs and encoder as the list endpoints, so timestamps match
+        body = JSON_ENCODER.encode({
+            "contacts": msgspec.convert(contacts, list[ContactOut]),
+            "subscribers": msgspec.convert(subscribers, list[NewsletterOut]),
+        })
+        return Response(body, media_type="application/json")
+    except Exception as e:
+        logger.exception(f"Error fetching overview: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch overview")
+
 # ----- Local dev entry ------------------------------------------------------
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "8001")))
+    # Import string (not the app object) is required for multiple workers
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8001")),
+        # "auto" uses uvloop/httptools when installed (not on Windows)
+        loop="auto",
+        http="auto",
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+    )
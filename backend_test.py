@@ -4,7 +4,8 @@ SMS Marketing SaaS Backend Testing Suite
 Tests all backend API endpoints and functionality
 """
 
-import requests
+import asyncio
+import httpx
 import json
 import uuid
 from datetime import datetime
@@ -17,7 +18,7 @@ BACKEND_URL = "https://sms-engage.preview.emergentagent.com/api"
 class BackendTester:
     def __init__(self):
         self.base_url = BACKEND_URL
-        self.session = requests.Session()
+        self.client = httpx.AsyncClient(base_url=BACKEND_URL, http2=True, timeout=10)
         self.test_results = []
         
     def log_test(self, test_name, success, message, details=None):
@@ -34,10 +35,10 @@ class BackendTester:
         if details and not success:
             print(f"   Details: {details}")
     
-    def test_health_check(self):
+    async def test_health_check(self):
         """Test the /api/health endpoint"""
         try:
-            response = self.session.get(f"{self.base_url}/health", timeout=10)
+            response = await self.client.get("/health", timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -55,7 +56,7 @@ class BackendTester:
             self.log_test("Health Check", False, f"Connection error: {str(e)}")
             return False
     
-    def test_cors_headers(self):
+    async def test_cors_headers(self):
         """Test CORS headers are properly set"""
         try:
             # Test preflight request
@@ -65,7 +66,7 @@ class BackendTester:
                 'Access-Control-Request-Headers': 'Content-Type'
             }
             
-            response = self.session.options(f"{self.base_url}/health", headers=headers, timeout=10)
+            response = await self.client.options("/health", headers=headers, timeout=10)
             
             cors_headers = {
                 'Access-Control-Allow-Origin': response.headers.get('Access-Control-Allow-Origin'),
@@ -86,7 +87,7 @@ class BackendTester:
             self.log_test("CORS Headers", False, f"Error testing CORS: {str(e)}")
             return False
     
-    def test_contact_form_submission(self):
+    async def test_contact_form_submission(self):
         """Test POST /api/contact with complete contact form data"""
         try:
             # Test data with realistic information
@@ -99,8 +100,8 @@ class BackendTester:
                 "plan_interest": "Professional"
             }
             
-            response = self.session.post(
-                f"{self.base_url}/contact",
+            response = await self.client.post(
+                "/contact",
                 json=contact_data,
                 headers={'Content-Type': 'application/json'},
                 timeout=10
@@ -128,7 +129,7 @@ class BackendTester:
             self.log_test("Contact Form Submission", False, f"Error: {str(e)}")
             return False, None
     
-    def test_newsletter_subscription(self):
+    async def test_newsletter_subscription(self):
         """Test POST /api/newsletter with email subscription"""
         try:
             # Test data with realistic email - make it unique with timestamp
@@ -138,8 +139,8 @@ class BackendTester:
                 "email": f"marketing.updates.{timestamp}@businesscorp.com"
             }
             
-            response = self.session.post(
-                f"{self.base_url}/newsletter",
+            response = await self.client.post(
+                "/newsletter",
                 json=newsletter_data,
                 headers={'Content-Type': 'application/json'},
                 timeout=10
@@ -166,7 +167,7 @@ class BackendTester:
             self.log_test("Newsletter Subscription", False, f"Error: {str(e)}")
             return False, None
     
-    def test_duplicate_newsletter_subscription(self):
+    async def test_duplicate_newsletter_subscription(self):
         """Test duplicate newsletter subscription handling"""
         try:
             # Use a known existing email for duplicate test
@@ -174,8 +175,8 @@ class BackendTester:
                 "email": "marketing.updates@businesscorp.com"
             }
             
-            response = self.session.post(
-                f"{self.base_url}/newsletter",
+            response = await self.client.post(
+                "/newsletter",
                 json=newsletter_data,
                 headers={'Content-Type': 'application/json'},
                 timeout=10
@@ -197,14 +198,14 @@ class BackendTester:
             self.log_test("Duplicate Newsletter Subscription", False, f"Error: {str(e)}")
             return False
     
-    def test_invalid_data_submissions(self):
+    async def test_invalid_data_submissions(self):
         """Test invalid data submission handling"""
         try:
             # Test invalid contact form (missing required fields)
             invalid_contact = {"name": ""}  # Missing email
             
-            response = self.session.post(
-                f"{self.base_url}/contact",
+            response = await self.client.post(
+                "/contact",
                 json=invalid_contact,
                 headers={'Content-Type': 'application/json'},
                 timeout=10
@@ -215,8 +216,8 @@ class BackendTester:
             # Test invalid newsletter (invalid email format)
             invalid_newsletter = {"email": "not-an-email"}
             
-            response = self.session.post(
-                f"{self.base_url}/newsletter",
+            response = await self.client.post(
+                "/newsletter",
                 json=invalid_newsletter,
                 headers={'Content-Type': 'application/json'},
                 timeout=10
@@ -238,13 +239,13 @@ class BackendTester:
             self.log_test("Invalid Data Validation", False, f"Error: {str(e)}")
             return False
     
-    def test_get_contacts(self):
+    async def test_get_contacts(self):
         """Test GET /api/contacts to verify data storage"""
         try:
-            response = self.session.get(f"{self.base_url}/contacts", timeout=10)
+            response = await self.client.get("/contacts", timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = response.json().get("items")
                 if isinstance(data, list):
                     # Check if we have at least one contact (from our previous test)
                     if len(data) > 0:
@@ -275,13 +276,13 @@ class BackendTester:
             self.log_test("Get Contacts", False, f"Error: {str(e)}")
             return False
     
-    def test_get_subscribers(self):
+    async def test_get_subscribers(self):
         """Test GET /api/subscribers to verify data storage"""
         try:
-            response = self.session.get(f"{self.base_url}/subscribers", timeout=10)
+            response = await self.client.get("/subscribers", timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = response.json().get("items")
                 if isinstance(data, list):
                     # Check if we have at least one subscriber (from our previous test)
                     if len(data) > 0:
@@ -312,34 +313,127 @@ class BackendTester:
             self.log_test("Get Subscribers", False, f"Error: {str(e)}")
             return False
     
-    def run_all_tests(self):
-        """Run all backend tests in sequence"""
+    async def test_contacts_pagination(self):
+        """Test GET /api/contacts?limit=1 and following the next cursor"""
+        try:
+            response = await self.client.get("/contacts", params={"limit": 1}, timeout=10)
+            
+            if response.status_code != 200:
+                self.log_test("Contacts Pagination", False, f"HTTP {response.status_code}", response.text)
+                return False
+            
+            page = response.json()
+            if len(page.get("items", [])) > 1:
+                self.log_test("Contacts Pagination", False, "limit=1 returned more than one item",
+                            {"count": len(page["items"])})
+                return False
+            if not page.get("next"):
+                self.log_test("Contacts Pagination", True, "Single page only (fewer than 2 contacts)")
+                return True
+            
+            response = await self.client.get("/contacts", params={"limit": 1, "after": page["next"]}, timeout=10)
+            if response.status_code != 200:
+                self.log_test("Contacts Pagination", False, f"Next page HTTP {response.status_code}", response.text)
+                return False
+            
+            next_page = response.json()
+            first_id = page["items"][0]["id"]
+            next_ids = [item["id"] for item in next_page.get("items", [])]
+            if len(next_ids) == 1 and first_id not in next_ids:
+                self.log_test("Contacts Pagination", True, "Next cursor returned the following contact",
+                            {"first": first_id, "second": next_ids[0]})
+                return True
+            else:
+                self.log_test("Contacts Pagination", False, "Next page did not advance",
+                            {"first": first_id, "next_page": next_ids})
+                return False
+                
+        except Exception as e:
+            self.log_test("Contacts Pagination", False, f"Error: {str(e)}")
+            return False
+    
+    async def test_pagination_validation(self):
+        """Test limit bounds (422) and malformed after cursors (400)"""
+        try:
+            statuses = {}
+            for name, params in [
+                ("limit=0", {"limit": 0}),
+                ("limit=1001", {"limit": 1001}),
+                ("bad cursor", {"after": "not-a-timestamp|x"}),
+            ]:
+                response = await self.client.get("/subscribers", params=params, timeout=10)
+                statuses[name] = response.status_code
+            
+            expected = {"limit=0": 422, "limit=1001": 422, "bad cursor": 400}
+            if statuses == expected:
+                self.log_test("Pagination Validation", True, "Out-of-range limits and bad cursors rejected")
+                return True
+            else:
+                self.log_test("Pagination Validation", False, "Unexpected status codes",
+                            {"expected": expected, "got": statuses})
+                return False
+                
+        except Exception as e:
+            self.log_test("Pagination Validation", False, f"Error: {str(e)}")
+            return False
+    
+    async def test_admin_overview(self):
+        """Test GET /api/admin/overview returns both collections"""
+        try:
+            response = await self.client.get("/admin/overview", timeout=10)
+            
+            if response.status_code == 200:
+                data = response.json()
+                if isinstance(data.get("contacts"), list) and isinstance(data.get("subscribers"), list):
+                    self.log_test("Admin Overview", True, "Overview returned contacts and subscribers",
+                                {"contacts": len(data["contacts"]), "subscribers": len(data["subscribers"])})
+                    return True
+                else:
+                    self.log_test("Admin Overview", False, "Response missing contacts/subscribers lists",
+                                {"keys": list(data)})
+                    return False
+            else:
+                self.log_test("Admin Overview", False, f"HTTP {response.status_code}", response.text)
+                return False
+                
+        except Exception as e:
+            self.log_test("Admin Overview", False, f"Error: {str(e)}")
+            return False
+    
+    async def run_all_tests(self):
+        """Run all backend tests, independent ones concurrently"""
         print(f"🚀 Starting SMS Marketing SaaS Backend Tests")
         print(f"📡 Testing backend at: {self.base_url}")
         print("=" * 60)
         
-        # Test sequence
-        tests = [
+        # Independent tests run together; the rest depend on data they write
+        independent = [
             ("Health Check", self.test_health_check),
             ("CORS Headers", self.test_cors_headers),
             ("Contact Form Submission", self.test_contact_form_submission),
             ("Newsletter Subscription", self.test_newsletter_subscription),
-            ("Duplicate Newsletter Subscription", self.test_duplicate_newsletter_subscription),
             ("Invalid Data Validation", self.test_invalid_data_submissions),
+        ]
+        dependent = [
+            ("Duplicate Newsletter Subscription", self.test_duplicate_newsletter_subscription),
             ("Get Contacts", self.test_get_contacts),
             ("Get Subscribers", self.test_get_subscribers),
+            ("Contacts Pagination", self.test_contacts_pagination),
+            ("Pagination Validation", self.test_pagination_validation),
+            ("Admin Overview", self.test_admin_overview),
         ]
         
         passed = 0
-        total = len(tests)
+        total = len(independent) + len(dependent)
         
-        for test_name, test_func in tests:
-            try:
-                result = test_func()
-                if result:
-                    passed += 1
-            except Exception as e:
-                self.log_test(test_name, False, f"Test execution error: {str(e)}")
+        async with self.client:
+            for group in (independent, dependent):
+                results = await asyncio.gather(*(test_func() for _, test_func in group), return_exceptions=True)
+                for (test_name, _), result in zip(group, results):
+                    if isinstance(result, Exception):
+                        self.log_test(test_name, False, f"Test execution error: {str(result)}")
+                    elif result is True or (isinstance(result, tuple) and result[0]):
+                        passed += 1
         
         print("=" * 60)
         print(f"📊 Test Results: {passed}/{total} tests passed")
@@ -369,7 +463,7 @@ class BackendTester:
 def main():
     """Main test execution"""
     tester = BackendTester()
-    success = tester.run_all_tests()
+    success = asyncio.run(tester.run_all_tests())
     
     # Print detailed summary
     summary = tester.get_summary()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# server.py lives in backend/ and is run from there, not installed as a package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+import server
+from server import BatchWriter
+
+
+class FakeCollection:
+    """Records insert_many calls and enforces an optional unique field."""
+
+    def __init__(self, unique=None, delay=0.0):
+        self.unique = unique
+        self.delay = delay
+        self.docs = []
+        self.calls = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append(len(docs))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        errors = []
+        for i, doc in enumerate(docs):
+            if self.unique and any(d[self.unique] == doc[self.unique] for d in self.docs):
+                errors.append({"index": i, "code": 11000, "errmsg": "E11000 duplicate key"})
+            else:
+                self.docs.append(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+def test_duplicate_in_batch_fails_only_that_caller():
+    coll = FakeCollection(unique="email")
+
+    async def run():
+        writer = BatchWriter(coll)
+        emails = ["a@x.com", "b@x.com", "a@x.com", "c@x.com"]
+        results = await asyncio.gather(
+            *(writer.insert({"email": e}) for e in emails), return_exceptions=True
+        )
+        await writer.close()
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] is None and results[1] is None and results[3] is None
+    assert isinstance(results[2], DuplicateKeyError)
+    assert coll.calls == [4]
+    assert [d["email"] for d in coll.docs] == ["a@x.com", "b@x.com", "c@x.com"]
+
+
+def test_close_drains_queued_writes():
+    coll = FakeCollection()
+
+    async def run():
+        writer = BatchWriter(coll)
+        tasks = [asyncio.ensure_future(writer.insert({"n": i})) for i in range(5)]
+        await asyncio.sleep(0)  # let every insert reach the queue
+        await writer.close()
+        assert writer.task is None
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == [None] * 5
+    assert len(coll.docs) == 5
+
+
+def test_dead_task_fails_pending_writes_and_restarts(monkeypatch):
+    coll = FakeCollection()
+    monkeypatch.setattr(server, "FLUSH_MS", 1000)  # hold the batch long enough to kill it
+
+    async def run():
+        writer = BatchWriter(coll)
+        tasks = [asyncio.ensure_future(writer.insert({"n": i})) for i in range(3)]
+        await asyncio.sleep(0.01)
+        writer.task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        monkeypatch.setattr(server, "FLUSH_MS", 0)
+        await writer.insert({"n": "after"})  # a dead task is replaced, not waited on
+        await writer.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert coll.docs == [{"n": "after"}]
+
+
+def test_restarts_on_a_new_event_loop():
+    coll = FakeCollection()
+    writer = BatchWriter(coll)
+
+    asyncio.run(writer.insert({"n": 1}))  # loop closes without close()
+    asyncio.run(asyncio.wait_for(writer.insert({"n": 2}), 1))
+
+    assert len(coll.docs) == 2
+
+
+def test_timeout_only_abandons_queued_writes(monkeypatch):
+    coll = FakeCollection(delay=0.2)
+    monkeypatch.setattr(server, "WRITE_TIMEOUT", 0.05)
+
+    async def run():
+        writer = BatchWriter(coll)
+        in_flight = asyncio.ensure_future(writer.insert({"n": 1}))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(writer.insert({"n": 2}))
+        results = await asyncio.gather(in_flight, queued, return_exceptions=True)
+        await writer.close()
+        return results
+
+    first, second = asyncio.run(run())
+    assert first is None  # outlived WRITE_TIMEOUT but was already being written
+    assert isinstance(second, asyncio.TimeoutError)
+    assert coll.docs == [{"n": 1}]
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from server import NewsletterOut, PageCache, UuidPool, page_filter, stream_page
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+        self.closed = False
+
+    async def next(self):
+        if not self.docs:
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def make_docs(n):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"id": f"id-{i}", "email": f"user{i}@x.com", "created_at": start + timedelta(seconds=i)}
+        for i in range(n)
+    ]
+
+
+def read_page(docs, limit, cache=None):
+    cache = cache or PageCache()
+    key = (limit, None)
+    cursor = FakeCursor(docs[1:])
+
+    async def run():
+        first = docs[0] if docs else None
+        gen = stream_page(cursor, first, NewsletterOut, limit, cache, key, cache.generation)
+        return b"".join([chunk async for chunk in gen])
+
+    body = asyncio.run(run())
+    assert cursor.closed
+    return body, cache
+
+
+def test_stream_page_envelope_and_cache():
+    docs = make_docs(3)
+    body, cache = read_page(docs, limit=3)
+    page = json.loads(body)
+
+    assert [item["id"] for item in page["items"]] == ["id-0", "id-1", "id-2"]
+    assert page["items"][0]["created_at"].endswith("Z")
+    assert page["next"] == "2026-01-01T00:00:02Z|id-2"
+    assert cache.get((3, None)) == body
+
+
+def test_short_page_has_no_next_cursor():
+    page = json.loads(read_page(make_docs(2), limit=5)[0])
+    assert len(page["items"]) == 2 and page["next"] is None
+
+    assert json.loads(read_page([], limit=5)[0]) == {"items": [], "next": None}
+
+
+def test_next_cursor_round_trips_through_page_filter():
+    docs = make_docs(2)
+    cursor = json.loads(read_page(docs, limit=2)[0])["next"]
+
+    assert page_filter(cursor) == {
+        "$or": [
+            {"created_at": {"$gt": docs[1]["created_at"]}},
+            {"created_at": docs[1]["created_at"], "id": {"$gt": "id-1"}},
+        ]
+    }
+
+
+def test_page_filter_without_cursor_and_with_bad_cursor():
+    assert page_filter(None) == {}
+    with pytest.raises(ValueError):
+        page_filter("not-a-timestamp|id-1")
+
+
+def test_page_cache_drops_stale_generation():
+    cache = PageCache()
+    generation = cache.generation
+    cache.invalidate()  # a write lands while the read is in flight
+
+    cache.store((100, None), generation, b"stale")
+    assert cache.get((100, None)) is None
+
+    cache.store((100, None), cache.generation, b"fresh")
+    assert cache.get((100, None)) == b"fresh"
+
+
+def test_page_cache_skips_pages_over_the_byte_budget():
+    cache = PageCache()
+    cache.store((1000, None), cache.generation, b"x" * (cache.pages.maxsize + 1))
+    assert cache.get((1000, None)) is None
+
+
+def test_uuid_pool_hands_out_unique_uuid4s_across_refills():
+    pool = UuidPool()
+    ids = [pool.next() for _ in range(UuidPool.SIZE // 16 + 10)]
+
+    assert len(set(ids)) == len(ids)
+    for value in ids[-20:]:
+        parsed = uuid.UUID(value)
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122